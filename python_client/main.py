@@ -1,46 +1,115 @@
-import requests
-import json
+import asyncio
+import httpx
+import itertools
+import logging
+import orjson
 import os
 
+logger = logging.getLogger(__name__)
+
 # --- Configuration ---
 SERVER_URL = os.getenv('SERVER_URL', 'http://localhost:3000')
 CLIENT_SECRET = os.getenv('CLIENT_SECRET', 'your-super-secret-client-key') # This should match the secret in server/src/index.ts
 
-# --- Dispatch Function ---
-def dispatch_message(extension_id: str, tab_id: int, action: str, payload: dict, correlation_id: str):
-    headers = {
-        'Authorization': f'Bearer {CLIENT_SECRET}',
-        'Content-Type': 'application/json',
-    }
-
-    message = {
-        'action': action,
-        'payload': payload,
-        'correlationId': correlation_id,
-    }
-
-    dispatch_payload = {
-        'target': {
-            'extensionId': extension_id,
-            'tabId': tab_id,
-        },
-        'message': message,
-    }
+# --- HTTP Client ---
+# A single HTTP/2 client keeps the connection to SERVER_URL alive between dispatches.
+_DISPATCH_HEADERS = {
+    'Authorization': f'Bearer {CLIENT_SECRET}',
+    'Content-Type': 'application/json',
+}
+_client = httpx.Client(
+    base_url=SERVER_URL,
+    headers=_DISPATCH_HEADERS,
+    timeout=10.0,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=10),
+    ),
+)
+
+def close():
+    """Release the pooled connections held by the dispatch client."""
+    _client.close()
+
+# --- Async HTTP/2 Client Settings ---
+# Concurrent dispatches are multiplexed as HTTP/2 streams over a shared connection pool.
+_ASYNC_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# --- Correlation IDs ---
+# One entropy draw per process; the counter keeps IDs unique without per-call getrandom().
+_CORRELATION_BASE = os.urandom(6).hex()
+_CORRELATION_COUNTER = itertools.count()
+
+def _next_correlation_id(tag: str) -> str:
+    return f'corr-{_CORRELATION_BASE}-{next(_CORRELATION_COUNTER)}-{tag}'
+
+# --- Dispatch Payload ---
+# The envelope keys never change, so only the field values go through the JSON encoder.
+_DISPATCH_TEMPLATE = b'{"target":{"extensionId":%s,"tabId":%d},"message":{"action":%s,"payload":%s,"correlationId":%s}}'
+
+def _build_dispatch_body(extension_id: str, tab_id: int, action: str, payload: dict, correlation_id: str) -> bytes:
+    return _DISPATCH_TEMPLATE % (
+        orjson.dumps(extension_id),
+        tab_id,
+        orjson.dumps(action),
+        orjson.dumps(payload),
+        orjson.dumps(correlation_id),
+    )
+
+# --- Dispatch Functions ---
+def dispatch_message(extension_id: str, tab_id: int, action: str, payload: dict, correlation_id: str, parse_response: bool = False):
+    dispatch_body = _build_dispatch_body(extension_id, tab_id, action, payload, correlation_id)
 
     try:
-        print(f"\nAttempting to dispatch {action} message...")
-        response = requests.post(f"{SERVER_URL}/api/dispatch", headers=headers, json=dispatch_payload)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Attempting to dispatch %s message', action)
+        response = _client.post('/api/dispatch', content=dispatch_body)
         response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
-        print("Dispatch successful:", response.json())
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error dispatching message: {e}")
-        if e.response is not None:
-            print("Server response:", e.response.json())
+        if not parse_response:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Dispatch of %s successful', action)
+            return None
+        result = orjson.loads(response.content)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Dispatch of %s successful: %s', action, result)
+        return result
+    except httpx.HTTPError as e:
+        logger.error('Error dispatching message: %s', e)
+        if isinstance(e, httpx.HTTPStatusError):
+            logger.error('Server response: %s', e.response.text)
         raise
 
+async def dispatch_many(messages, parse_response: bool = False):
+    """Dispatch (extension_id, tab_id, action, payload, correlation_id) tuples concurrently."""
+    # The client is scoped to the call: its connections are bound to the running event loop.
+    async with httpx.AsyncClient(base_url=SERVER_URL, http2=True, limits=_ASYNC_LIMITS, timeout=30.0, headers=_DISPATCH_HEADERS) as client:
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Attempting to dispatch %d messages concurrently', len(messages))
+            responses = await asyncio.gather(*(
+                client.post('/api/dispatch', content=_build_dispatch_body(*message))
+                for message in messages
+            ))
+            for response in responses:
+                response.raise_for_status()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Dispatched %d messages successfully', len(responses))
+            if not parse_response:
+                return None
+            return [orjson.loads(response.content) for response in responses]
+        except httpx.HTTPError as e:
+            logger.error('Error dispatching messages: %s', e)
+            if isinstance(e, httpx.HTTPStatusError):
+                logger.error('Server response: %s', e.response.text)
+            raise
+
 # --- Example Usage ---
 if __name__ == "__main__":
+    # Only this module's dispatch progress at DEBUG; httpx/httpcore/hpack stay at INFO
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger.setLevel(logging.DEBUG)
+
     # Replace with the actual ID of your installed Chrome extension
     EXTENSION_ID = os.getenv('EXTENSION_ID', 'YOUR_EXTENSION_ID')
     # Replace with the ID of the target browser tab
@@ -58,7 +127,7 @@ if __name__ == "__main__":
             TARGET_TAB_ID,
             'SELECT_PROJECT',
             {'selector': '#myProjectElement'},
-            f'corr-{os.urandom(8).hex()}-proj'
+            _next_correlation_id('proj')
         )
 
         # Example: Fill a prompt
@@ -67,8 +136,10 @@ if __name__ == "__main__":
             TARGET_TAB_ID,
             'FILL_PROMPT',
             {'selector': 'textarea#promptInput', 'value': 'Hello from Python!'},
-            f'corr-{os.urandom(8).hex()}-fill'
+            _next_correlation_id('fill')
         )
 
     except Exception as e:
         print(f"Failed to dispatch messages: {e}")
+    finally:
+        close()
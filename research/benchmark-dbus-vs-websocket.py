@@ -4,16 +4,73 @@ D-Bus vs WebSocket Performance Benchmark
 
 This script benchmarks communication performance between D-Bus signals
 and WebSocket communication for ChatGPT-buddy automation events.
+
+D-Bus signals are sent through python3-dbus when it is installed, so the
+numbers reflect IPC cost rather than process startup. Without the bindings
+the benchmark falls back to the dbus-send command.
+
+WebSocket round-trips are measured against a loopback echo server when
+websockets is installed (on uvloop when available); otherwise only the
+simulation runs.
+
+Prerequisites:
+- numpy
+- orjson
+- python3-dbus, websockets, uvloop (optional)
 """
 
+import array
+import asyncio
 import time
-import json
+import numpy as np
+import orjson
 import subprocess
 import threading
 import statistics
 import sys
 from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    import dbus
+    import dbus.lowlevel
+except ImportError:
+    dbus = None
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+# uvloop is best-effort: it only exists on POSIX, Windows keeps the default asyncio loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+DBUS_SIGNAL_PATH = '/org/chatgpt/buddy/automation'
+DBUS_SIGNAL_INTERFACE = 'org.chatgpt.buddy.automation'
+DBUS_SIGNAL_MEMBER = 'AutomationEvent'
+
+# Only the integer fields vary, so concurrent test messages skip the encoder entirely
+CONCURRENT_TEST_TEMPLATE = b'{"thread_id":%d,"action":"CONCURRENT_TEST","timestamp":%d}'
+
+def _websocket_test_message():
+    """Build the dispatch envelope used by the WebSocket benchmarks."""
+    return {
+        "target": {
+            "extensionId": "test_extension_id",
+            "tabId": 123
+        },
+        "message": {
+            "action": "SELECT_PROJECT",
+            "payload": {
+                "selector": "#test-selector",
+                "value": "test-value"
+            },
+            "correlationId": ""
+        }
+    }
 
 class PerformanceBenchmark:
     """
@@ -22,8 +79,61 @@ class PerformanceBenchmark:
     
     def __init__(self):
         self.dbus_results = []
+        self.dbus_batched_results = []
         self.websocket_results = []
+        self.websocket_real_results = []
         self.test_iterations = 100
+        self._bus = self._connect_session_bus()
+        self._thread_state = threading.local()
+        self._thread_buses = []
+        
+    def _connect_session_bus(self, private=False):
+        """Open a session bus connection, or None to fall back to dbus-send."""
+        if dbus is None:
+            return None
+        try:
+            return dbus.SessionBus(private=private)
+        except dbus.exceptions.DBusException as e:
+            print(f"⚠️  D-Bus session bus not available, falling back to dbus-send: {e}")
+            return None
+    
+    def _thread_bus(self):
+        """Return this thread's private bus connection (SessionBus is not thread-safe)."""
+        if self._bus is None:
+            return None
+        # A failed connect is cached as None too, so each thread tries (and warns) only once
+        if not hasattr(self._thread_state, 'bus'):
+            bus = self._thread_state.bus = self._connect_session_bus(private=True)
+            if bus is not None:
+                self._thread_buses.append(bus)
+        return self._thread_state.bus
+    
+    def _close_thread_buses(self):
+        """Close the private connections opened by _thread_bus."""
+        for bus in self._thread_buses:
+            bus.close()
+        self._thread_buses.clear()
+        self._thread_state = threading.local()
+    
+    def _send_dbus_signal(self, bus, action, payload_json, timeout):
+        """Send one AutomationEvent signal and report whether it was accepted."""
+        if bus is not None:
+            msg = dbus.lowlevel.SignalMessage(DBUS_SIGNAL_PATH, DBUS_SIGNAL_INTERFACE, DBUS_SIGNAL_MEMBER)
+            msg.append(action, payload_json, signature='ss')
+            bus.send_message(msg)
+            return True
+        
+        result = subprocess.run([
+            'dbus-send',
+            '--session',
+            '--type=signal',
+            '--dest=org.chatgpt.buddy.automation',
+            DBUS_SIGNAL_PATH,
+            f'{DBUS_SIGNAL_INTERFACE}.{DBUS_SIGNAL_MEMBER}',
+            f'string:{action}',
+            f'string:{payload_json}'
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+        return result.returncode == 0
         
     def run_benchmark(self):
         """Run comprehensive performance benchmark."""
@@ -33,63 +143,72 @@ class PerformanceBenchmark:
         # Run D-Bus benchmarks
         print("📡 Testing D-Bus Signal Performance...")
         self.benchmark_dbus_signals()
+        self.benchmark_dbus_signals_batched()
         
         # Simulated WebSocket benchmarks (since we don't have a running server)
         print("🌐 Simulating WebSocket Performance...")
         self.benchmark_websocket_simulation()
         
+        print("🌐 Testing Real WebSocket Performance...")
+        self.benchmark_websocket_real()
+        
         # Compare results
         self.compare_results()
         
         return {
             'dbus': self.dbus_results,
-            'websocket': self.websocket_results
+            'dbus_batched': self.dbus_batched_results,
+            'websocket': self.websocket_results,
+            'websocket_real': self.websocket_real_results
         }
     
     def benchmark_dbus_signals(self):
         """Benchmark D-Bus signal communication performance."""
         print(f"  Running {self.test_iterations} D-Bus signal tests...")
         
+        # Reuse one payload dict; only iteration and timestamp change per signal
+        base = {"iteration": 0, "timestamp": 0}
+        
         for i in range(self.test_iterations):
-            start_time = time.perf_counter()
+            start_time = time.perf_counter_ns()
             
             try:
+                base["iteration"] = i
+                base["timestamp"] = time.time_ns()
+                payload_bytes = orjson.dumps(base)
+                
                 # Send D-Bus signal
-                result = subprocess.run([
-                    'dbus-send',
-                    '--session',
-                    '--type=signal',
-                    '--dest=org.chatgpt.buddy.automation',
-                    '/org/chatgpt/buddy/automation',
-                    'org.chatgpt.buddy.automation.AutomationEvent',
-                    'string:BENCHMARK_TEST',
-                    f'string:{json.dumps({"iteration": i, "timestamp": time.time()})}'
-                ], capture_output=True, text=True, timeout=1)
+                success = self._send_dbus_signal(
+                    self._bus,
+                    'BENCHMARK_TEST',
+                    payload_bytes.decode(),
+                    timeout=1
+                )
                 
-                end_time = time.perf_counter()
-                latency = (end_time - start_time) * 1000  # Convert to milliseconds
+                end_time = time.perf_counter_ns()
+                latency = end_time - start_time
                 
                 self.dbus_results.append({
                     'iteration': i,
-                    'latency_ms': latency,
-                    'success': result.returncode == 0,
-                    'payload_size': len(json.dumps({"iteration": i, "timestamp": time.time()}))
+                    'latency_ns': latency,
+                    'success': success,
+                    'payload_size': len(payload_bytes)
                 })
                 
             except subprocess.TimeoutExpired:
-                end_time = time.perf_counter()
+                end_time = time.perf_counter_ns()
                 self.dbus_results.append({
                     'iteration': i,
-                    'latency_ms': (end_time - start_time) * 1000,
+                    'latency_ns': end_time - start_time,
                     'success': False,
                     'payload_size': 0,
                     'error': 'timeout'
                 })
             except Exception as e:
-                end_time = time.perf_counter()
+                end_time = time.perf_counter_ns()
                 self.dbus_results.append({
                     'iteration': i,
-                    'latency_ms': (end_time - start_time) * 1000,
+                    'latency_ns': end_time - start_time,
                     'success': False,
                     'payload_size': 0,
                     'error': str(e)
@@ -97,57 +216,98 @@ class PerformanceBenchmark:
         
         print(f"  ✅ D-Bus tests completed")
     
+    def benchmark_dbus_signals_batched(self, batch_size=64):
+        """Benchmark D-Bus signals queued in batches and flushed once per batch."""
+        if self._bus is None:
+            print("  ⚠️  Skipping batched D-Bus tests (python3-dbus session bus not available)")
+            return
+        
+        print(f"  Running {self.test_iterations} D-Bus signal tests in batches of {batch_size}...")
+        
+        base = {"iteration": 0, "timestamp": 0}
+        
+        for batch_start in range(0, self.test_iterations, batch_size):
+            batch_end = min(batch_start + batch_size, self.test_iterations)
+            count = batch_end - batch_start
+            start_time = time.perf_counter_ns()
+            
+            try:
+                for i in range(batch_start, batch_end):
+                    base["iteration"] = i
+                    base["timestamp"] = time.time_ns()
+                    msg = dbus.lowlevel.SignalMessage(DBUS_SIGNAL_PATH, DBUS_SIGNAL_INTERFACE, DBUS_SIGNAL_MEMBER)
+                    msg.append('BENCHMARK_BATCH_TEST', orjson.dumps(base).decode(), signature='ss')
+                    self._bus.send_message(msg)
+                self._bus.flush()
+                
+                end_time = time.perf_counter_ns()
+                self.dbus_batched_results.append({
+                    'batch': batch_start // batch_size,
+                    'batch_size': count,
+                    'latency_ns': (end_time - start_time) // count,
+                    'success': True
+                })
+                
+            except Exception as e:
+                end_time = time.perf_counter_ns()
+                self.dbus_batched_results.append({
+                    'batch': batch_start // batch_size,
+                    'batch_size': count,
+                    'latency_ns': (end_time - start_time) // count,
+                    'success': False,
+                    'error': str(e)
+                })
+        
+        successful = [r['latency_ns'] for r in self.dbus_batched_results if r['success']]
+        if successful:
+            print(f"  ✅ Batched D-Bus tests completed ({statistics.mean(successful) / 1_000_000:.3f}ms per signal)")
+        else:
+            print(f"  ❌ Batched D-Bus tests failed")
+    
     def benchmark_websocket_simulation(self):
-        """Simulate WebSocket communication performance."""
+        """
+        Simulate WebSocket communication performance.
+        
+        Only serialization is real work here; network latency is a fixed
+        sleep, so use benchmark_websocket_real for actual round-trip numbers.
+        """
         print(f"  Running {self.test_iterations} WebSocket simulation tests...")
         
+        # The envelope is constant except for its correlation ID
+        message = _websocket_test_message()
+        correlated = message["message"]
+        
         # Simulate WebSocket overhead with JSON serialization and network simulation
         for i in range(self.test_iterations):
-            start_time = time.perf_counter()
+            start_time = time.perf_counter_ns()
             
             try:
                 # Simulate WebSocket message creation and processing
-                message = {
-                    "target": {
-                        "extensionId": "test_extension_id",
-                        "tabId": 123
-                    },
-                    "message": {
-                        "action": "SELECT_PROJECT",
-                        "payload": {
-                            "selector": "#test-selector",
-                            "value": "test-value"
-                        },
-                        "correlationId": f"benchmark-{i}-{time.time()}"
-                    }
-                }
+                correlated["correlationId"] = f"benchmark-{i}-{time.time_ns()}"
                 
                 # Serialize message (WebSocket overhead)
-                serialized = json.dumps(message)
+                serialized = orjson.dumps(message)
                 
                 # Simulate network latency (typical WebSocket latency: 1-10ms)
                 network_latency = 0.002 + (i % 10) * 0.001  # 2-11ms
                 time.sleep(network_latency)
                 
-                # Deserialize message
-                deserialized = json.loads(serialized)
-                
-                end_time = time.perf_counter()
-                latency = (end_time - start_time) * 1000  # Convert to milliseconds
+                end_time = time.perf_counter_ns()
+                latency = end_time - start_time
                 
                 self.websocket_results.append({
                     'iteration': i,
-                    'latency_ms': latency,
+                    'latency_ns': latency,
                     'success': True,
                     'payload_size': len(serialized),
                     'network_simulation': network_latency * 1000
                 })
                 
             except Exception as e:
-                end_time = time.perf_counter()
+                end_time = time.perf_counter_ns()
                 self.websocket_results.append({
                     'iteration': i,
-                    'latency_ms': (end_time - start_time) * 1000,
+                    'latency_ns': end_time - start_time,
                     'success': False,
                     'payload_size': 0,
                     'error': str(e)
@@ -155,151 +315,190 @@ class PerformanceBenchmark:
         
         print(f"  ✅ WebSocket simulation completed")
     
+    def benchmark_websocket_real(self):
+        """Benchmark WebSocket round-trips against a loopback echo server."""
+        if websockets is None:
+            print("  ⚠️  Skipping real WebSocket tests (websockets not installed)")
+            return
+        
+        print(f"  Running {self.test_iterations} WebSocket round-trip tests...")
+        
+        if uvloop is not None:
+            uvloop.install()
+        asyncio.run(self._websocket_round_trips())
+        
+        print(f"  ✅ WebSocket round-trip tests completed")
+    
+    async def _websocket_round_trips(self):
+        """Send test_iterations messages over one connection and time each echo."""
+        async def echo(websocket, *args):
+            async for message in websocket:
+                await websocket.send(message)
+        
+        # compression=None skips permessage-deflate; binary frames skip UTF-8 validation
+        async with websockets.serve(echo, '127.0.0.1', 0, compression=None) as server:
+            port = server.sockets[0].getsockname()[1]
+            
+            message = _websocket_test_message()
+            correlated = message["message"]
+            
+            async with websockets.connect(f'ws://127.0.0.1:{port}', compression=None) as websocket:
+                for i in range(self.test_iterations):
+                    start_time = time.perf_counter_ns()
+                    
+                    try:
+                        correlated["correlationId"] = f"benchmark-{i}-{time.time_ns()}"
+                        serialized = orjson.dumps(message)
+                        await websocket.send(serialized)
+                        orjson.loads(await websocket.recv())
+                        
+                        end_time = time.perf_counter_ns()
+                        self.websocket_real_results.append({
+                            'iteration': i,
+                            'latency_ns': end_time - start_time,
+                            'success': True,
+                            'payload_size': len(serialized)
+                        })
+                        
+                    except Exception as e:
+                        end_time = time.perf_counter_ns()
+                        self.websocket_real_results.append({
+                            'iteration': i,
+                            'latency_ns': end_time - start_time,
+                            'success': False,
+                            'payload_size': 0,
+                            'error': str(e)
+                        })
+    
     def benchmark_concurrent_performance(self):
         """Benchmark concurrent message handling."""
         print("🔄 Testing Concurrent Performance...")
         
         concurrent_threads = [5, 10, 20, 50]
         
-        for thread_count in concurrent_threads:
-            print(f"  Testing with {thread_count} concurrent threads...")
-            
-            # D-Bus concurrent test
-            dbus_concurrent_results = []
-            start_time = time.perf_counter()
+        max_workers = max(concurrent_threads)
+        
+        # One pool for every sweep. The initializer opens each worker's private bus,
+        # and the barrier forces all workers to start here, so no sweep pays for
+        # thread start-up or connection setup inside its timings
+        with ThreadPoolExecutor(max_workers=max_workers, initializer=self._thread_bus) as executor:
+            warmup = threading.Barrier(max_workers)
+            wait([executor.submit(warmup.wait) for _ in range(max_workers)])
             
-            with ThreadPoolExecutor(max_workers=thread_count) as executor:
-                futures = []
-                for i in range(thread_count):
-                    future = executor.submit(self.send_dbus_signal_concurrent, i)
-                    futures.append(future)
+            for thread_count in concurrent_threads:
+                print(f"  Testing with {thread_count} concurrent threads...")
                 
-                for future in futures:
-                    result = future.result()
-                    dbus_concurrent_results.append(result)
-            
-            dbus_end_time = time.perf_counter()
-            dbus_total_time = (dbus_end_time - start_time) * 1000
-            
-            # WebSocket simulation concurrent test
-            websocket_concurrent_results = []
-            start_time = time.perf_counter()
-            
-            with ThreadPoolExecutor(max_workers=thread_count) as executor:
-                futures = []
-                for i in range(thread_count):
-                    future = executor.submit(self.simulate_websocket_concurrent, i)
-                    futures.append(future)
+                # D-Bus concurrent test
+                start_time = time.perf_counter_ns()
                 
-                for future in futures:
-                    result = future.result()
-                    websocket_concurrent_results.append(result)
-            
-            websocket_end_time = time.perf_counter()
-            websocket_total_time = (websocket_end_time - start_time) * 1000
-            
-            print(f"    D-Bus: {dbus_total_time:.2f}ms total, {dbus_total_time/thread_count:.2f}ms avg")
-            print(f"    WebSocket: {websocket_total_time:.2f}ms total, {websocket_total_time/thread_count:.2f}ms avg")
+                futures = [executor.submit(self.send_dbus_signal_concurrent, i) for i in range(thread_count)]
+                wait(futures)
+                dbus_concurrent_results = [future.result() for future in futures]
+                
+                dbus_end_time = time.perf_counter_ns()
+                dbus_total_time = (dbus_end_time - start_time) / 1_000_000
+                
+                # WebSocket simulation concurrent test
+                start_time = time.perf_counter_ns()
+                
+                futures = [executor.submit(self.simulate_websocket_concurrent, i) for i in range(thread_count)]
+                wait(futures)
+                websocket_concurrent_results = [future.result() for future in futures]
+                
+                websocket_end_time = time.perf_counter_ns()
+                websocket_total_time = (websocket_end_time - start_time) / 1_000_000
+                
+                print(f"    D-Bus: {dbus_total_time:.2f}ms total, {dbus_total_time/thread_count:.2f}ms avg")
+                print(f"    WebSocket: {websocket_total_time:.2f}ms total, {websocket_total_time/thread_count:.2f}ms avg")
+        
+        self._close_thread_buses()
     
     def send_dbus_signal_concurrent(self, thread_id):
         """Send D-Bus signal in concurrent test."""
-        start_time = time.perf_counter()
+        # Connection setup happens before the clock starts: only the send is measured
+        bus = self._thread_bus()
+        start_time = time.perf_counter_ns()
         
         try:
-            result = subprocess.run([
-                'dbus-send',
-                '--session',
-                '--type=signal',
-                '--dest=org.chatgpt.buddy.automation',
-                '/org/chatgpt/buddy/automation',
-                'org.chatgpt.buddy.automation.AutomationEvent',
-                'string:CONCURRENT_TEST',
-                f'string:{json.dumps({"thread_id": thread_id, "timestamp": time.time()})}'
-            ], capture_output=True, text=True, timeout=2)
+            success = self._send_dbus_signal(
+                bus,
+                'CONCURRENT_TEST',
+                orjson.dumps({"thread_id": thread_id, "timestamp": time.time_ns()}).decode(),
+                timeout=2
+            )
             
-            end_time = time.perf_counter()
+            end_time = time.perf_counter_ns()
             return {
                 'thread_id': thread_id,
-                'latency_ms': (end_time - start_time) * 1000,
-                'success': result.returncode == 0
+                'latency_ns': end_time - start_time,
+                'success': success
             }
             
         except Exception as e:
-            end_time = time.perf_counter()
+            end_time = time.perf_counter_ns()
             return {
                 'thread_id': thread_id,
-                'latency_ms': (end_time - start_time) * 1000,
+                'latency_ns': end_time - start_time,
                 'success': False,
                 'error': str(e)
             }
     
     def simulate_websocket_concurrent(self, thread_id):
-        """Simulate WebSocket message in concurrent test."""
-        start_time = time.perf_counter()
+        """Simulate WebSocket message in concurrent test (serialization plus a 1ms sleep)."""
+        start_time = time.perf_counter_ns()
         
         try:
-            message = {
-                "thread_id": thread_id,
-                "action": "CONCURRENT_TEST",
-                "timestamp": time.time()
-            }
-            
-            serialized = json.dumps(message)
+            serialized = CONCURRENT_TEST_TEMPLATE % (thread_id, time.time_ns())
             time.sleep(0.001)  # Simulate 1ms network
-            deserialized = json.loads(serialized)
             
-            end_time = time.perf_counter()
+            end_time = time.perf_counter_ns()
             return {
                 'thread_id': thread_id,
-                'latency_ms': (end_time - start_time) * 1000,
+                'latency_ns': end_time - start_time,
                 'success': True
             }
             
         except Exception as e:
-            end_time = time.perf_counter()
+            end_time = time.perf_counter_ns()
             return {
                 'thread_id': thread_id,
-                'latency_ms': (end_time - start_time) * 1000,
+                'latency_ns': end_time - start_time,
                 'success': False,
                 'error': str(e)
             }
     
+    def _latency_stats(self, results, error):
+        """Summarize successful latencies (in ms) gathered in a single pass over results."""
+        latencies = array.array('d')
+        for result in results:
+            if result['success']:
+                latencies.append(result['latency_ns'])
+        
+        if not latencies:
+            return {'error': error}
+        
+        values = np.frombuffer(latencies, dtype=np.float64) / 1e6
+        return {
+            'mean': values.mean(),
+            'median': np.median(values),
+            'min': values.min(),
+            'max': values.max(),
+            'stdev': values.std(ddof=1) if values.size > 1 else 0.0,
+            'success_rate': len(latencies) / len(results) * 100
+        }
+    
     def compare_results(self):
         """Compare and analyze performance results."""
         print("\n" + "=" * 60)
         print("📊 Performance Analysis Results")
         print("=" * 60)
         
-        # Filter successful results
-        dbus_successful = [r for r in self.dbus_results if r['success']]
-        websocket_successful = [r for r in self.websocket_results if r['success']]
+        # Prefer real WebSocket round-trips over the sleep-based simulation
+        websocket_results = self.websocket_real_results or self.websocket_results
         
         # Calculate statistics
-        if dbus_successful:
-            dbus_latencies = [r['latency_ms'] for r in dbus_successful]
-            dbus_stats = {
-                'mean': statistics.mean(dbus_latencies),
-                'median': statistics.median(dbus_latencies),
-                'min': min(dbus_latencies),
-                'max': max(dbus_latencies),
-                'stdev': statistics.stdev(dbus_latencies) if len(dbus_latencies) > 1 else 0,
-                'success_rate': len(dbus_successful) / len(self.dbus_results) * 100
-            }
-        else:
-            dbus_stats = {'error': 'No successful D-Bus tests'}
-        
-        if websocket_successful:
-            websocket_latencies = [r['latency_ms'] for r in websocket_successful]
-            websocket_stats = {
-                'mean': statistics.mean(websocket_latencies),
-                'median': statistics.median(websocket_latencies),
-                'min': min(websocket_latencies),
-                'max': max(websocket_latencies),
-                'stdev': statistics.stdev(websocket_latencies) if len(websocket_latencies) > 1 else 0,
-                'success_rate': len(websocket_successful) / len(self.websocket_results) * 100
-            }
-        else:
-            websocket_stats = {'error': 'No successful WebSocket tests'}
+        dbus_stats = self._latency_stats(self.dbus_results, 'No successful D-Bus tests')
+        websocket_stats = self._latency_stats(websocket_results, 'No successful WebSocket tests')
         
         # Print comparison
         print("🔍 Latency Comparison (milliseconds):")
@@ -20,6 +20,7 @@ Test Commands:
 """
 
 import dbus
+import dbus.lowlevel
 import time
 import json
 import argparse
@@ -45,6 +46,21 @@ class ChatGPTBuddyDBusClient:
             # Connect to session bus
             self.bus = dbus.SessionBus()
             
+            # Register signal handlers once; monitor_signals only runs the loop
+            self.bus.add_signal_receiver(
+                self.on_automation_completed,
+                dbus_interface="org.chatgpt.buddy.automation",
+                signal_name="AutomationCompleted"
+            )
+            
+            self.bus.add_signal_receiver(
+                self.on_automation_event,
+                dbus_interface="org.chatgpt.buddy.automation", 
+                signal_name="AutomationEvent"
+            )
+            
+            self._loop = GLib.MainLoop()
+            
             # Get reference to ChatGPT-buddy service
             try:
                 self.buddy_service = self.bus.get_object(
@@ -83,28 +99,21 @@ class ChatGPTBuddyDBusClient:
             # Send as D-Bus signal
             signal_data = json.dumps(event_data)
             
-            # Method 1: Send via dbus-send command (most reliable)
-            import subprocess
-            cmd = [
-                "dbus-send", 
-                "--session",
-                "--type=signal",
-                "--dest=org.chatgpt.buddy",
+            # Send on the existing bus connection (no dbus-send child process)
+            msg = dbus.lowlevel.SignalMessage(
                 "/automation",
-                "org.chatgpt.buddy.automation.AutomationEvent",
-                f"string:{action}",
-                f"string:{signal_data}"
-            ]
+                "org.chatgpt.buddy.automation",
+                "AutomationEvent"
+            )
+            msg.set_destination("org.chatgpt.buddy")
+            msg.append(action, signal_data, signature='ss')
+            self.bus.send_message(msg)
+            self.bus.flush()
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"📡 Sent D-Bus signal: {action}")
-                print(f"   Correlation ID: {correlation_id}")
-                print(f"   Payload: {payload}")
-                return correlation_id
-            else:
-                print(f"❌ Failed to send D-Bus signal: {result.stderr}")
-                return None
+            print(f"📡 Sent D-Bus signal: {action}")
+            print(f"   Correlation ID: {correlation_id}")
+            print(f"   Payload: {payload}")
+            return correlation_id
                 
         except Exception as e:
             print(f"❌ Error sending automation signal: {e}")
@@ -132,28 +141,15 @@ class ChatGPTBuddyDBusClient:
         """Monitor D-Bus signals for a specified duration."""
         print(f"👁️  Monitoring D-Bus signals for {duration} seconds...")
         
-        # Set up signal handlers
-        self.bus.add_signal_receiver(
-            self.on_automation_completed,
-            dbus_interface="org.chatgpt.buddy.automation",
-            signal_name="AutomationCompleted"
-        )
-        
-        self.bus.add_signal_receiver(
-            self.on_automation_event,
-            dbus_interface="org.chatgpt.buddy.automation", 
-            signal_name="AutomationEvent"
-        )
-        
         # Monitor for specified duration
         def stop_monitoring():
             print("⏰ Monitoring period ended")
-            loop.quit()
+            self._loop.quit()
+            return False
             
         GLib.timeout_add_seconds(duration, stop_monitoring)
         
-        loop = GLib.MainLoop()
-        loop.run()
+        self._loop.run()
     
     def on_automation_completed(self, result):
         """Handle AutomationCompleted signals."""
@@ -156,6 +156,11 @@ class DBusIntegrationManager {
           console.log('🏓 D-Bus ping response received');
           break;
           
+        case 'BATCH':
+          // The host coalesces bursts of messages into a single frame
+          message.msgs.forEach((batchedMessage) => this.handleDBusMessage(batchedMessage));
+          break;
+          
         default:
           console.warn('❓ Unknown D-Bus message type:', message.type);
       }
@@ -8,6 +8,7 @@ with a browser extension via native messaging protocol.
 Prerequisites:
 - python3-dbus
 - python3-gi
+- msgspec
 - D-Bus session bus access
 
 Usage:
@@ -20,8 +21,11 @@ Test with:
       string:"Hello from client"
 """
 
+import collections
 import dbus
-import json
+import msgspec
+import os
+import queue
 import sys
 import time
 import struct
@@ -29,6 +33,104 @@ import threading
 from dbus.mainloop.glib import DBusGMainLoop
 from gi.repository import GLib
 
+# Native Python type for each D-Bus scalar type; msgspec rejects these str/int/float/bytes
+# subclasses, while dbus.Array, dbus.Struct and dbus.Dictionary are encoded as-is
+_DBUS_ARG_TYPES = {
+    dbus.String: str,
+    dbus.ObjectPath: str,
+    dbus.Signature: str,
+    dbus.Byte: int,
+    dbus.Int16: int,
+    dbus.Int32: int,
+    dbus.Int64: int,
+    dbus.UInt16: int,
+    dbus.UInt32: int,
+    dbus.UInt64: int,
+    dbus.Double: float,
+    dbus.Boolean: bool,
+    dbus.ByteArray: bytes,
+}
+
+
+def _dbus_to_py(obj):
+    """msgspec enc_hook: convert a D-Bus argument to its native type at encode time, falling back to str()."""
+    return _DBUS_ARG_TYPES.get(type(obj), str)(obj)
+
+
+# Chrome native messaging only accepts JSON frames, so msgspec.json is used
+# rather than msgpack; it is still much faster than the stdlib json module.
+_encoder = msgspec.json.Encoder(enc_hook=_dbus_to_py)
+_decoder = msgspec.json.Decoder()
+
+
+# Native messaging length prefix: 4-byte little-endian unsigned int
+_U32 = struct.Struct('<I')
+
+# Outgoing messages are coalesced into BATCH frames to save a header + write + flush each
+OUT_FLUSH_INTERVAL_MS = 5
+OUT_BATCH_SIZE = 32
+OUT_FLUSH_THRESHOLD = 16
+
+# Chrome drops the port on any host-to-browser message over 1 MB, so batches stay
+# well below it and messages past the budget go out in a frame of their own
+NATIVE_MESSAGE_MAX = 1024 * 1024
+OUT_BATCH_BYTES = 256 * 1024
+_BATCH_PREFIX = b'{"type":"BATCH","msgs":['
+_BATCH_SUFFIX = b']}'
+
+# Log lines are written to stderr in batches, at most once per interval (seconds)
+LOG_FLUSH_INTERVAL = 0.05
+
+# Decoded extension messages waiting for the GLib main loop
+IN_QUEUE_SIZE = 256
+
+# Read size when draining the wakeup pipe; any bytes left over just fire the watch again
+WAKEUP_READ_SIZE = 4096
+
+# Queued by the reader when stdin ends; distinct from any decoded message, JSON null included
+_EOF = object()
+
+# Pre-built frames for the keepalive/status replies; only the variable fields are spliced in.
+# %a writes a float's repr, which is also its JSON form
+_PONG_TEMPLATE = b'{"type":"PONG","timestamp":%a}'
+_STATUS_TEMPLATE = (
+    b'{"type":"STATUS_UPDATE","dbus_connected":true,"service_registered":%s,'
+    b'"uptime":%a,"message_count":%d}'
+)
+
+# Automation members forwarded to the extension; the bus drops every other member
+AUTOMATION_SIGNALS = ('AutomationEvent', 'AutomationCompleted', 'TestSignal')
+
+
+def _write_all(fd, data):
+    """Write data to fd, retrying short writes; normally a single os.write."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _read_exact(fd, size):
+    """Read exactly size bytes from fd, or return b'' at end of stream."""
+    chunks = []
+    while size:
+        chunk = os.read(fd, size)
+        if not chunk:
+            return b''
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class SignalMsg(msgspec.Struct):
+    """D-Bus signal forwarded to the browser extension."""
+    type: str
+    interface: str
+    args: tuple  # Raw D-Bus arguments, converted by _dbus_to_py only when encoded
+    sender: str
+    timestamp: float
+    path: str
+
+
 class ChatGPTBuddyDBusMonitor:
     """
     D-Bus signal monitor that bridges D-Bus events to browser extension
@@ -36,11 +138,27 @@ class ChatGPTBuddyDBusMonitor:
     """
     
     def __init__(self):
+        # State first: setup_dbus already logs and may queue messages
+        self.message_queue = collections.deque(maxlen=100)  # Oldest log entries drop off automatically
+        # Encoded outgoing messages; only touched from the GLib main loop, so no lock
+        self._out_queue = collections.deque()
+        self._flush_source = None
+        self.setup_logging()
         self.setup_dbus()
         self.setup_native_messaging()
-        self.message_queue = []
-        self.running = True
         
+    def setup_logging(self):
+        """Start the stderr log writer when running from a terminal."""
+        # Checked once: lines are only formatted when stderr is a terminal. This drops them
+        # under the browser (Firefox shows host stderr in its Browser Console) and with 2>file
+        self._log_to_stderr = sys.stderr.isatty()
+        self._log_q = queue.Queue()
+        
+        if self._log_to_stderr:
+            self._log_thread = threading.Thread(target=self._write_logs)
+            self._log_thread.daemon = True
+            self._log_thread.start()
+    
     def setup_dbus(self):
         """Initialize D-Bus connection and signal handlers."""
         try:
@@ -50,19 +168,23 @@ class ChatGPTBuddyDBusMonitor:
             # Connect to session bus
             self.bus = dbus.SessionBus()
             
-            # Monitor ChatGPT-buddy automation signals
-            self.bus.add_signal_receiver(
-                self.on_automation_signal,
-                dbus_interface="org.chatgpt.buddy.automation",
-                path="/automation"
-            )
+            # Monitor ChatGPT-buddy automation signals, one match rule per member
+            for member in AUTOMATION_SIGNALS:
+                self.bus.add_signal_receiver(
+                    self.on_automation_signal,
+                    dbus_interface="org.chatgpt.buddy.automation",
+                    path="/automation",
+                    signal_name=member,
+                    byte_arrays=True
+                )
             
             # Monitor Firefox signals (if available)
             try:
                 self.bus.add_signal_receiver(
                     self.on_firefox_signal,
                     dbus_interface="org.mozilla.firefox.Remote",
-                    path="/org/mozilla/firefox/Remote"
+                    path="/org/mozilla/firefox/Remote",
+                    byte_arrays=True
                 )
             except Exception as e:
                 self.log_message(f"Firefox D-Bus monitoring not available: {e}")
@@ -74,6 +196,7 @@ class ChatGPTBuddyDBusMonitor:
             
         except Exception as e:
             self.log_message(f"Failed to initialize D-Bus: {e}")
+            self._stop_log_writer()
             sys.exit(1)
     
     def setup_dbus_service(self):
@@ -94,7 +217,13 @@ class ChatGPTBuddyDBusMonitor:
     def setup_native_messaging(self):
         """Initialize native messaging communication with browser extension."""
         self.stdin = sys.stdin.buffer
-        self.stdout = sys.stdout.buffer
+        self.stdout_fd = sys.stdout.fileno()
+        
+        # The reader thread only decodes frames; handling (and any D-Bus emission)
+        # runs on the GLib main loop, woken through a pipe after each enqueue
+        self._in_queue = queue.Queue(maxsize=IN_QUEUE_SIZE)
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        GLib.io_add_watch(self._wakeup_r, GLib.PRIORITY_DEFAULT, GLib.IO_IN, self._drain_in_queue)
         
         # Start input reader thread
         self.input_thread = threading.Thread(target=self.read_native_messages)
@@ -105,74 +234,156 @@ class ChatGPTBuddyDBusMonitor:
     
     def on_automation_signal(self, *args, **kwargs):
         """Handle ChatGPT-buddy automation signals."""
-        signal_data = {
-            "type": "DBUS_AUTOMATION_SIGNAL",
-            "interface": "org.chatgpt.buddy.automation",
-            "args": [str(arg) for arg in args],  # Convert to JSON-serializable
-            "sender": kwargs.get('sender', 'unknown'),
-            "timestamp": time.time(),
-            "path": "/automation"
-        }
+        signal_data = SignalMsg(
+            type="DBUS_AUTOMATION_SIGNAL",
+            interface="org.chatgpt.buddy.automation",
+            args=args,
+            sender=kwargs.get('sender', 'unknown'),
+            timestamp=time.time(),
+            path="/automation"
+        )
         
+        # Encoded once when queued; logging only records a short tag, not the args' repr
         self.send_to_extension(signal_data)
-        self.log_message(f"Automation signal received: {args}")
+        self.log_message(f"Automation signal received: {len(args)} args")
     
     def on_firefox_signal(self, *args, **kwargs):
         """Handle Firefox D-Bus signals."""
-        signal_data = {
-            "type": "DBUS_FIREFOX_SIGNAL", 
-            "interface": "org.mozilla.firefox.Remote",
-            "args": [str(arg) for arg in args],
-            "sender": kwargs.get('sender', 'unknown'),
-            "timestamp": time.time(),
-            "path": "/org/mozilla/firefox/Remote"
-        }
+        signal_data = SignalMsg(
+            type="DBUS_FIREFOX_SIGNAL",
+            interface="org.mozilla.firefox.Remote",
+            args=args,
+            sender=kwargs.get('sender', 'unknown'),
+            timestamp=time.time(),
+            path="/org/mozilla/firefox/Remote"
+        )
         
         self.send_to_extension(signal_data)
-        self.log_message(f"Firefox signal received: {args}")
+        self.log_message(f"Firefox signal received: {len(args)} args")
     
     def send_to_extension(self, message):
-        """Send message to browser extension using native messaging protocol."""
+        """Encode message and queue it for the browser extension; it is sent on the next flush."""
+        # Encoding per message means one unencodable message is lost alone, not the whole flush
         try:
-            # Encode message as JSON
-            encoded_message = json.dumps(message).encode('utf-8')
-            
-            # Send length prefix (4 bytes, little-endian)
-            length = len(encoded_message)
-            self.stdout.write(struct.pack('<I', length))
+            encoded_message = _encoder.encode(message)
+        except Exception as e:
+            self.log_message(f"Failed to encode message for extension: {e}")
+            return
+        self._send_raw(encoded_message)
+    
+    def _send_raw(self, encoded_message):
+        """Queue an already JSON-encoded message; it is spliced into the frame without re-encoding."""
+        if len(encoded_message) > NATIVE_MESSAGE_MAX:
+            self.log_message(f"Dropping {len(encoded_message)}-byte message: over the native messaging limit")
+            return
+        
+        self._out_queue.append(encoded_message)
+        if len(self._out_queue) >= OUT_FLUSH_THRESHOLD:
+            self._flush_out()
+        elif self._flush_source is None:
+            # One-shot timer, armed only while something is waiting, so an idle host never wakes
+            self._flush_source = GLib.timeout_add(OUT_FLUSH_INTERVAL_MS, self._on_flush_timeout)
+    
+    def _on_flush_timeout(self):
+        """GLib timeout: send what is queued, then let the timer lapse."""
+        self._flush_source = None
+        self._flush_out()
+        return False
+    
+    def _flush_out(self):
+        """Send queued messages using native messaging protocol, batching up to OUT_BATCH_SIZE / OUT_BATCH_BYTES per frame."""
+        if not self._out_queue:
+            return
+        
+        buf = bytearray()
+        while self._out_queue:
+            # Reserve the length prefix and fill it in (4 bytes, little-endian) once the frame is built
+            start = len(buf)
+            buf += b'\0\0\0\0'
             
-            # Send message content
-            self.stdout.write(encoded_message)
-            self.stdout.flush()
+            first = self._out_queue.popleft()
+            size = len(_BATCH_PREFIX) + len(first) + len(_BATCH_SUFFIX)
+            if not self._out_queue or size + 1 + len(self._out_queue[0]) > OUT_BATCH_BYTES:
+                # Lone message, or the next one would overflow the batch: send it as-is
+                buf += first
+            else:
+                buf += _BATCH_PREFIX
+                buf += first
+                count = 1
+                while (self._out_queue and count < OUT_BATCH_SIZE
+                       and size + 1 + len(self._out_queue[0]) <= OUT_BATCH_BYTES):
+                    message = self._out_queue.popleft()
+                    size += 1 + len(message)
+                    count += 1
+                    buf += b','
+                    buf += message
+                buf += _BATCH_SUFFIX
             
-        except Exception as e:
+            _U32.pack_into(buf, start, len(buf) - start - 4)
+        
+        # Every frame in one contiguous write, bypassing Python's stdout buffer
+        try:
+            _write_all(self.stdout_fd, buf)
+        except OSError as e:
             self.log_message(f"Failed to send message to extension: {e}")
     
     def read_native_messages(self):
-        """Read messages from browser extension via native messaging."""
+        """Read messages from browser extension via native messaging and queue them for the main loop."""
+        stdin_fd = self.stdin.fileno()
+        
         try:
-            while self.running:
+            # Runs until stdin hits EOF, i.e. the browser disconnected
+            while True:
                 # Read message length (4 bytes)
-                length_bytes = self.stdin.read(4)
+                length_bytes = _read_exact(stdin_fd, 4)
                 if not length_bytes:
                     break
                 
-                length = struct.unpack('<I', length_bytes)[0]
+                length = _U32.unpack(length_bytes)[0]
                 
                 # Read message content
-                message_bytes = self.stdin.read(length)
+                message_bytes = _read_exact(stdin_fd, length)
                 if not message_bytes:
                     break
                 
                 # Parse JSON message
                 try:
-                    message = json.loads(message_bytes.decode('utf-8'))
-                    self.handle_extension_message(message)
-                except json.JSONDecodeError as e:
+                    message = _decoder.decode(message_bytes)
+                except msgspec.DecodeError as e:
                     self.log_message(f"Invalid JSON from extension: {e}")
+                    continue
+                
+                # handle_extension_message expects an object; anything else would raise on the main loop
+                if not isinstance(message, dict):
+                    self.log_message(f"Ignoring non-object message from extension: {type(message).__name__}")
+                    continue
+                
+                self._in_queue.put(message)
+                os.write(self._wakeup_w, b'\0')
                     
         except Exception as e:
             self.log_message(f"Error reading native messages: {e}")
+        finally:
+            # Sentinel: tells the main loop the extension side is gone
+            self._in_queue.put(_EOF)
+            os.write(self._wakeup_w, b'\0')
+    
+    def _drain_in_queue(self, fd, condition):
+        """Handle queued extension messages on the GLib main loop."""
+        os.read(fd, WAKEUP_READ_SIZE)
+        
+        while True:
+            try:
+                message = self._in_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message is _EOF:
+                self._loop.quit()
+                return False
+            self.handle_extension_message(message)
+        
+        # Keep the watch installed
+        return True
     
     def handle_extension_message(self, message):
         """Handle messages received from browser extension."""
@@ -181,7 +392,7 @@ class ChatGPTBuddyDBusMonitor:
         if msg_type == 'SEND_DBUS_SIGNAL':
             self.emit_dbus_signal(message.get('signal', {}))
         elif msg_type == 'PING':
-            self.send_to_extension({"type": "PONG", "timestamp": time.time()})
+            self._send_raw(_PONG_TEMPLATE % time.time())
         elif msg_type == 'GET_STATUS':
             self.send_status_update()
         else:
@@ -204,31 +415,53 @@ class ChatGPTBuddyDBusMonitor:
     
     def send_status_update(self):
         """Send current status to browser extension."""
-        status = {
-            "type": "STATUS_UPDATE",
-            "dbus_connected": True,
-            "service_registered": hasattr(self, 'service'),
-            "uptime": time.time(),
-            "message_count": len(self.message_queue)
-        }
-        self.send_to_extension(status)
+        self._send_raw(_STATUS_TEMPLATE % (
+            b'true' if hasattr(self, 'service') else b'false',
+            time.time(),
+            len(self.message_queue)
+        ))
     
     def log_message(self, message):
         """Log message to stderr (visible when running from terminal)."""
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        sys.stderr.write(f"[{timestamp}] ChatGPT-buddy D-Bus: {message}\n")
-        sys.stderr.flush()
+        timestamp = time.time()
+        if self._log_to_stderr:
+            self._log_q.put_nowait((timestamp, message))
         
         # Also queue for extension
         self.message_queue.append({
             "type": "LOG_MESSAGE",
             "message": message,
-            "timestamp": time.time()
+            "timestamp": timestamp
         })
-        
-        # Keep queue size manageable
-        if len(self.message_queue) > 100:
-            self.message_queue = self.message_queue[-50:]
+    
+    def _write_logs(self):
+        """Drain queued log lines to stderr with one write and flush per batch."""
+        while True:
+            entries = [self._log_q.get()]
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            
+            # Collect whatever else arrives within the flush interval
+            while entries[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entries.append(self._log_q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            done = entries[-1] is None
+            if done:
+                entries.pop()
+            
+            sys.stderr.write(''.join(
+                f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))}] ChatGPT-buddy D-Bus: {message}\n"
+                for timestamp, message in entries
+            ))
+            sys.stderr.flush()
+            
+            if done:
+                return
     
     def run(self):
         """Start the D-Bus monitoring main loop."""
@@ -239,12 +472,12 @@ class ChatGPTBuddyDBusMonitor:
             self.send_to_extension({
                 "type": "MONITOR_STARTED",
                 "timestamp": time.time(),
-                "pid": os.getpid() if 'os' in globals() else 'unknown'
+                "pid": os.getpid()
             })
             
             # Start GLib main loop for D-Bus
-            loop = GLib.MainLoop()
-            loop.run()
+            self._loop = GLib.MainLoop()
+            self._loop.run()
             
         except KeyboardInterrupt:
             self.log_message("Received interrupt signal, shutting down...")
@@ -255,8 +488,15 @@ class ChatGPTBuddyDBusMonitor:
     
     def cleanup(self):
         """Clean up resources before exit."""
-        self.running = False
         self.log_message("D-Bus monitor shutting down")
+        self._flush_out()
+        self._stop_log_writer()
+    
+    def _stop_log_writer(self):
+        """Let the log writer drain pending lines before exit."""
+        if self._log_to_stderr:
+            self._log_q.put(None)
+            self._log_thread.join(timeout=1)
 
 
 class ChatGPTBuddyDBusService(dbus.service.Object):
@@ -310,13 +550,15 @@ class ChatGPTBuddyDBusService(dbus.service.Object):
         elif signal_name == "AutomationEvent" and len(args) >= 2:
             self.AutomationEvent(str(args[0]), str(args[1]))
         else:
-            # Generic event
-            self.AutomationEvent(signal_name, json.dumps(args))
+            # Generic event; payloads that arrive already serialized are passed through as-is
+            if isinstance(args, str):
+                payload = args
+            else:
+                payload = _encoder.encode(args).decode('utf-8')
+            self.AutomationEvent(signal_name, payload)
 
 
 if __name__ == "__main__":
-    import os
-    
     # Initialize and run the D-Bus monitor
     monitor = ChatGPTBuddyDBusMonitor()
     monitor.run()
\ No newline at end of file
@@ -7,12 +7,23 @@ full D-Bus Python bindings. Uses command line tools instead.
 """
 
 import subprocess
+import shutil
 import json
 import time
 import sys
 import threading
 import signal
 from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared dbus-send prefix for every test signal
+DBUS_SEND_BASE = (
+    'dbus-send',
+    '--session',
+    '--type=signal',
+    '--dest=org.chatgpt.buddy.automation',
+    '/org/chatgpt/buddy/automation',
+)
 
 class DBusIntegrationTester:
     """
@@ -28,11 +39,19 @@ class DBusIntegrationTester:
         print("🧪 Starting ChatGPT-buddy D-Bus Integration Tests")
         print("=" * 60)
         
-        self.test_dbus_availability()
-        self.test_signal_sending()
-        self.test_signal_monitoring()
-        self.test_bidirectional_communication()
-        self.test_native_messaging_format()
+        tests = [
+            self.test_dbus_availability,
+            self.test_signal_sending,
+            self.test_signal_monitoring,
+            self.test_bidirectional_communication,
+            self.test_native_messaging_format,
+        ]
+        
+        # The tests are independent and mostly wait on subprocesses and sleeps,
+        # so running them together bounds wall time by the slowest one
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [executor.submit(test) for test in tests]
+            self.test_results = [future.result() for future in futures]
         
         print("\n" + "=" * 60)
         print("📊 Test Results Summary:")
@@ -53,40 +72,27 @@ class DBusIntegrationTester:
         test_name = "D-Bus Tools Availability"
         
         try:
-            # Check dbus-send
-            result = subprocess.run(['which', 'dbus-send'], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                self.test_results.append({
-                    'name': test_name,
-                    'passed': False,
-                    'message': 'dbus-send not found'
-                })
-                return
-                
-            # Check dbus-monitor
-            result = subprocess.run(['which', 'dbus-monitor'], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                self.test_results.append({
+            # Check dbus-send and dbus-monitor on PATH (no child processes needed)
+            missing = [tool for tool in ('dbus-send', 'dbus-monitor') if shutil.which(tool) is None]
+            if missing:
+                return {
                     'name': test_name,
                     'passed': False,
-                    'message': 'dbus-monitor not found'
-                })
-                return
+                    'message': f"{' and '.join(missing)} not found"
+                }
             
-            self.test_results.append({
+            return {
                 'name': test_name,
                 'passed': True,
                 'message': 'dbus-send and dbus-monitor available'
-            })
+            }
             
         except Exception as e:
-            self.test_results.append({
+            return {
                 'name': test_name,
                 'passed': False,
                 'message': f'Error checking tools: {e}'
-            })
+            }
     
     def test_signal_sending(self):
         """Test sending D-Bus signals."""
@@ -95,35 +101,31 @@ class DBusIntegrationTester:
         try:
             # Send test signal
             result = subprocess.run([
-                'dbus-send',
-                '--session',
-                '--type=signal',
-                '--dest=org.chatgpt.buddy.automation',
-                '/org/chatgpt/buddy/automation',
+                *DBUS_SEND_BASE,
                 'org.chatgpt.buddy.automation.AutomationEvent',
                 'string:INTEGRATION_TEST',
                 f'string:{json.dumps({"test": "signal_sending", "timestamp": time.time()})}'
-            ], capture_output=True, text=True, timeout=5)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=5)
             
             if result.returncode == 0:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': True,
                     'message': 'Signal sent successfully'
-                })
+                }
             else:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': False,
-                    'message': f'Signal sending failed: {result.stderr}'
-                })
+                    'message': f"Signal sending failed: {result.stderr.decode(errors='replace')}"
+                }
                 
         except Exception as e:
-            self.test_results.append({
+            return {
                 'name': test_name,
                 'passed': False,
                 'message': f'Error sending signal: {e}'
-            })
+            }
     
     def test_signal_monitoring(self):
         """Test monitoring D-Bus signals."""
@@ -142,15 +144,11 @@ class DBusIntegrationTester:
             
             # Send test signal
             send_result = subprocess.run([
-                'dbus-send',
-                '--session',
-                '--type=signal',
-                '--dest=org.chatgpt.buddy.automation',
-                '/org/chatgpt/buddy/automation',
+                *DBUS_SEND_BASE,
                 'org.chatgpt.buddy.automation.AutomationEvent',
                 'string:MONITOR_TEST',
                 f'string:{json.dumps({"test": "monitoring", "timestamp": time.time()})}'
-            ], capture_output=True, text=True, timeout=5)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=5)
             
             # Give time for signal to be received
             time.sleep(1)
@@ -161,24 +159,24 @@ class DBusIntegrationTester:
             
             # Check if signal was captured
             if 'AutomationEvent' in stdout and 'MONITOR_TEST' in stdout:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': True,
                     'message': 'Signal monitoring successful'
-                })
+                }
             else:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': False,
                     'message': 'Signal not captured by monitor'
-                })
+                }
                 
         except Exception as e:
-            self.test_results.append({
+            return {
                 'name': test_name,
                 'passed': False,
                 'message': f'Error monitoring signals: {e}'
-            })
+            }
     
     def test_bidirectional_communication(self):
         """Test bidirectional D-Bus communication."""
@@ -196,15 +194,11 @@ class DBusIntegrationTester:
             }
             
             subprocess.run([
-                'dbus-send',
-                '--session',
-                '--type=signal',
-                '--dest=org.chatgpt.buddy.automation',
-                '/org/chatgpt/buddy/automation',
+                *DBUS_SEND_BASE,
                 'org.chatgpt.buddy.automation.AutomationEvent',
                 'string:AUTOMATION_REQUEST',
                 f'string:{json.dumps(automation_request)}'
-            ], capture_output=True, text=True, timeout=5)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=5)
             
             # Test 2: Send completion signal
             completion_response = {
@@ -215,34 +209,30 @@ class DBusIntegrationTester:
             }
             
             result = subprocess.run([
-                'dbus-send',
-                '--session',
-                '--type=signal',
-                '--dest=org.chatgpt.buddy.automation',
-                '/org/chatgpt/buddy/automation',
+                *DBUS_SEND_BASE,
                 'org.chatgpt.buddy.automation.AutomationCompleted',
                 f'string:{json.dumps(completion_response)}'
-            ], capture_output=True, text=True, timeout=5)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=5)
             
             if result.returncode == 0:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': True,
                     'message': 'Bidirectional communication flow tested'
-                })
+                }
             else:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': False,
                     'message': 'Failed to complete communication flow'
-                })
+                }
                 
         except Exception as e:
-            self.test_results.append({
+            return {
                 'name': test_name,
                 'passed': False,
                 'message': f'Error in bidirectional test: {e}'
-            })
+            }
     
     def test_native_messaging_format(self):
         """Test native messaging format compatibility."""
@@ -259,31 +249,31 @@ class DBusIntegrationTester:
                 }
             }
             
-            # Simulate native messaging encoding
+            # Simulate native messaging encoding (compact, like the monitor's frames)
             import struct
-            encoded_message = json.dumps(test_message).encode('utf-8')
+            encoded_message = json.dumps(test_message, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
             length = len(encoded_message)
             
             # Verify format is correct
             if length > 0 and length < 1024 * 1024:  # Reasonable size limit
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': True,
                     'message': f'Native messaging format valid (length: {length})'
-                })
+                }
             else:
-                self.test_results.append({
+                return {
                     'name': test_name,
                     'passed': False,
                     'message': f'Invalid message length: {length}'
-                })
+                }
                 
         except Exception as e:
-            self.test_results.append({
+            return {
                 'name': test_name,
                 'passed': False,
                 'message': f'Error testing native messaging format: {e}'
-            })
+            }
 
 def main():
     """Run D-Bus integration tests."""